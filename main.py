@@ -2,36 +2,34 @@
 # Kaindra
 
 # IMPORTS
-from src.data_downloader import save_data_to_csv, get_tickers, download_data
+from src.data_downloader import save_data_files, get_tickers, download_data
 from src.greedy_simulator import run_greedy_simulations
 from src.dp_simulator import run_dp_simulations
-from src.data_manager import save_results_summary, plot_portfolio_performance, create_performance_summary_chart
-import os
+from src.data_manager import save_results_summary, plot_portfolio_performance, create_performance_summary_chart, build_stock_data_dict
 import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
 
 # FUNCTION DEFINITIONS
 def clear_folders():
     """
     Clear all data in the data and results folders.
     """
-    folders_to_clear = ["data", "results", "results/greedy", "results/dp"]
-    
-    for folder in folders_to_clear:
-        if os.path.exists(folder):
-            print(f"Clearing {folder} folder...")
-            shutil.rmtree(folder)
-            print(f"{folder} folder cleared.")
-    
+    # Remove the two top-level trees; their subfolders go with them
+    for folder in ("data", "results"):
+        print(f"Clearing {folder} folder...")
+        shutil.rmtree(folder, ignore_errors=True)
+
     # Recreate the folder structure
-    folders_to_create = ["data", "results", "results/greedy", "results/dp"]
-    for folder in folders_to_create:
-        os.makedirs(folder, exist_ok=True)
+    for folder in ("data", "results/greedy", "results/dp"):
+        Path(folder).mkdir(parents=True, exist_ok=True)
         print(f"{folder} folder created.")
 
 def print_comparison_summary(greedy_results, dp_results):
     """
     Print a detailed comparison between Greedy and Dynamic Programming results.
-    
+
     Args:
         greedy_results (dict): Results from greedy algorithm
         dp_results (dict): Results from dynamic programming algorithm
@@ -39,36 +37,42 @@ def print_comparison_summary(greedy_results, dp_results):
     print("\n" + "="*80)
     print("ALGORITHM COMPARISON SUMMARY")
     print("="*80)
-    
+
     initial_capital = 10000000
-    
-    print(f"{'Stock':<8} {'Greedy Final':<15} {'Greedy Return':<12} {'DP Final':<15} {'DP Return':<12} {'Better':<10}")
-    print("-" * 80)
-    
-    greedy_total = 0
-    dp_total = 0
-    
-    for stock_code in greedy_results.keys():
-        if stock_code in dp_results:
-            greedy_final = greedy_results[stock_code].iloc[-1]
-            dp_final = dp_results[stock_code].iloc[-1]
-            
-            greedy_return = ((greedy_final - initial_capital) / initial_capital) * 100
-            dp_return = ((dp_final - initial_capital) / initial_capital) * 100
-            
-            better = "DP" if dp_final > greedy_final else "Greedy"
-            
-            print(f"{stock_code:<8} {greedy_final:<15,.0f} {greedy_return:<12.2f}% {dp_final:<15,.0f} {dp_return:<12.2f}% {better:<10}")
-            
-            greedy_total += greedy_final
-            dp_total += dp_final
-    
+
+    # Only compare stocks present in both result sets
+    common_stocks = [code for code in greedy_results if code in dp_results]
+    if not common_stocks:
+        print("No overlapping stocks to compare.")
+        return
+
+    # Final values as column arrays; the returns come out of one ufunc call each
+    greedy_finals  = np.array([greedy_results[code].iloc[-1] for code in common_stocks])
+    dp_finals      = np.array([dp_results[code].iloc[-1] for code in common_stocks])
+    greedy_returns = (greedy_finals / initial_capital - 1) * 100
+    dp_returns     = (dp_finals / initial_capital - 1) * 100
+
+    comparison = pd.DataFrame({
+        'Greedy Final': greedy_finals,
+        'Greedy Return': greedy_returns,
+        'DP Final': dp_finals,
+        'DP Return': dp_returns,
+        'Better': np.where(dp_finals > greedy_finals, 'DP', 'Greedy')
+    }, index=pd.Index(common_stocks, name='Stock'))
+
+    print(comparison.to_string(formatters={
+        'Greedy Final': '{:,.0f}'.format,
+        'Greedy Return': '{:.2f}%'.format,
+        'DP Final': '{:,.0f}'.format,
+        'DP Return': '{:.2f}%'.format,
+    }))
+
     print("-" * 80)
-    greedy_avg_return = ((greedy_total/len(greedy_results) - initial_capital) / initial_capital) * 100
-    dp_avg_return = ((dp_total/len(dp_results) - initial_capital) / initial_capital) * 100
-    
-    print(f"{'AVERAGE':<8} {greedy_total/len(greedy_results):<15,.0f} {greedy_avg_return:<12.2f}% {dp_total/len(dp_results):<15,.0f} {dp_avg_return:<12.2f}% {'DP' if dp_avg_return > greedy_avg_return else 'Greedy':<10}")
-    
+    greedy_avg_return = greedy_returns.mean()
+    dp_avg_return     = dp_returns.mean()
+
+    print(f"{'AVERAGE':<8} {greedy_finals.mean():<15,.0f} {greedy_avg_return:<12.2f}% {dp_finals.mean():<15,.0f} {dp_avg_return:<12.2f}% {'DP' if dp_avg_return > greedy_avg_return else 'Greedy':<10}")
+
     overall_winner = "Dynamic Programming" if dp_avg_return > greedy_avg_return else "Greedy Algorithm"
     print(f"\nOVERALL WINNER: {overall_winner}")
 
@@ -102,8 +106,11 @@ def main():
         print("No data available for the selected tickers.")
         return
 
-    # Save the downloaded data to CSV files
-    save_data_to_csv(stock_data, tickers)
+    # Save the downloaded data to Parquet files (for user inspection)
+    save_data_files(stock_data, tickers)
+
+    # Keep the downloaded data in memory so the simulators don't re-read the CSVs
+    preloaded_data = build_stock_data_dict(stock_data)
 
     # Input: user choice for algorithm
     print("\n" + "="*60)
@@ -117,7 +124,7 @@ def main():
     if algorithm_choice == "1":
         # Run only Greedy Algorithm
         print("\nRunning Greedy Algorithm simulation on all stock data...")
-        results, stock_data_dict = run_greedy_simulations(data_folder)
+        results, stock_data_dict = run_greedy_simulations(data_folder, preloaded=preloaded_data)
         algorithm_name = "Greedy"
         
         # Save results to greedy folder
@@ -128,7 +135,7 @@ def main():
     elif algorithm_choice == "2":
         # Run only Dynamic Programming
         print("\nRunning Dynamic Programming simulation on all stock data...")
-        results, stock_data_dict = run_dp_simulations(data_folder)
+        results, stock_data_dict = run_dp_simulations(data_folder, preloaded=preloaded_data)
         algorithm_name = "Dynamic Programming"
         
         # Save results to dp folder
@@ -143,12 +150,12 @@ def main():
         print("\n" + "="*50)
         print("GREEDY ALGORITHM RESULTS")
         print("="*50)
-        greedy_results, stock_data_dict = run_greedy_simulations(data_folder)
-        
+        greedy_results, stock_data_dict = run_greedy_simulations(data_folder, preloaded=preloaded_data)
+
         print("\n" + "="*50)
         print("DYNAMIC PROGRAMMING RESULTS")
         print("="*50)
-        dp_results, _ = run_dp_simulations(data_folder)
+        dp_results, _ = run_dp_simulations(data_folder, preloaded=preloaded_data)
         
         # Combine results for comparison
         results = {
@@ -174,7 +181,7 @@ def main():
     else:
         print("Invalid choice. Defaulting to Greedy Algorithm.")
         print("\nRunning Greedy Algorithm simulation on all stock data...")
-        results, stock_data_dict = run_greedy_simulations(data_folder)
+        results, stock_data_dict = run_greedy_simulations(data_folder, preloaded=preloaded_data)
         algorithm_name = "Greedy"
         
         # Save results to greedy folder
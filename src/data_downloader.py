@@ -6,6 +6,7 @@ import yfinance as yf
 import pandas as pd
 import os
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 # STATIC DEFINITIONS
 # Calculate dynamic dates: 2 years ago to today
@@ -15,9 +16,6 @@ START_DATE                  = two_years_ago.strftime("%Y-%m-%d")
 END_DATE                    = today.strftime("%Y-%m-%d")
 
 # FUNCTION DEFINITIONS
-if not os.path.exists("data"):
-    os.makedirs("data")
-
 def get_tickers():
     """Getting user input for tickers."""
     input_tickers           = input("Input Stock Codes (comma separated), for example: BBCA, BBRI\n > ")
@@ -54,34 +52,48 @@ def download_data(tickers, start = START_DATE, end = END_DATE):
     print("Download successful.")
     return close_prices
 
-def save_data_to_csv(close_data, tickers):
-    """Save the close price data to separate CSV files."""
-    
+def save_data_files(close_data, tickers):
+    """Save the close price data to separate Parquet files (one per ticker)."""
+
     # Handle: if close_data is empty
     if close_data.empty:
         print("No data to save.")
         return
-    
-    # Loop: through each ticker and save to CSV
+
+    # Make sure the output folder exists (only needed when actually saving)
+    os.makedirs("data", exist_ok=True)
+
+    # Split the frame into per-ticker Series once, instead of paying the
+    # column-indexing path for every ticker
+    series_by_ticker        = close_data.to_dict(orient='series')
+
+    def write_one(ticker):
+        """Write a single ticker's data; returns a status line to print."""
+        file_name           = ticker.replace('.JK', '')
+        file_path           = f"data/{file_name}.parquet"
+
+        stock_series        = series_by_ticker[ticker].dropna()
+
+        # Handle: if the stock series is empty after dropping NaN values
+        if stock_series.empty:
+            return f"No data available for {ticker} in the selected date range."
+        stock_series.to_frame(name='Close').to_parquet(file_path)
+        return f"Data for {ticker} successfully saved to: {file_path}"
+
+    known_tickers           = [ticker for ticker in tickers if ticker in series_by_ticker]
+
+    # Write the files in parallel: the GIL is released around the file I/O,
+    # so a small thread pool overlaps the per-ticker writes
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for message in executor.map(write_one, known_tickers):
+            print(message)
+
     for ticker in tickers:
-        if ticker in close_data.columns:
-            file_name       = ticker.replace('.JK', '')
-            file_path       = f"data/{file_name}.csv"
-
-            stock_series    = close_data[ticker].dropna()
-
-            # Handle: if the stock series is empty after dropping NaN values
-            if stock_series.empty:
-                print(f"No data available for {ticker} in the selected date range.")
-                continue
-            stock_series.to_csv(file_path, header=['Close'], index_label='Date')
-            print(f"Data for {ticker} successfully saved to: {file_path}")
-        
-        else:
+        if ticker not in series_by_ticker:
             print(f"Warning: Ticker '{ticker}' not found after download. It might be an invalid code.")
 
 if __name__ == "__main__":
     tickers_to_download     = get_tickers()
     close_data              = download_data(tickers_to_download, start = START_DATE, end = END_DATE)
     if not close_data.empty:
-        save_data_to_csv(close_data, tickers_to_download)
\ No newline at end of file
+        save_data_files(close_data, tickers_to_download)
\ No newline at end of file
@@ -4,38 +4,153 @@
 # IMPORTS
 import glob
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import functools
+from .rolling import rolling_mean, max_drawdown
+
+# Handle: pyarrow is optional; when present, read_csv can use its
+# multithreaded C++ parser for the legacy CSV files
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:
+    _HAVE_PYARROW = False
+
+# NOTE: matplotlib and seaborn cost several hundred ms to import and are only
+# needed by the plotting functions, so they are imported lazily inside them.
+
+# CLASS DEFINITIONS
+@dataclass
+class PortfolioResult:
+    """
+    Light-weight portfolio series: raw values plus their date index.
+
+    Cheaper than a pd.Series for result passing (no Index hash table per
+    stock) while staying duck-type compatible with the accesses the rest of
+    the code performs (.values, .index, .iloc[-1], .to_numpy()).
+    """
+    values: np.ndarray
+    index: pd.DatetimeIndex
+
+    @property
+    def iloc(self):
+        # Positional access works directly on the underlying array
+        return self.values
+
+    def to_numpy(self):
+        return self.values
+
+    def __len__(self):
+        return len(self.values)
 
 # FUNCTION DEFINITIONS
+def _data_folder_signature(data_folder):
+    """
+    Fingerprint a data folder as (file name, mtime) pairs.
+
+    Used as the cache key for load_all_stock_data, so the cache is
+    invalidated whenever a file is added, removed or rewritten.
+
+    Args:
+        data_folder (str): Path to the folder containing the data files.
+
+    Returns:
+        tuple: Sorted (filename, mtime) pairs, empty if the folder is missing.
+    """
+    try:
+        entries = os.listdir(data_folder)
+    except OSError:
+        return ()
+    return tuple(sorted(
+        (name, os.path.getmtime(os.path.join(data_folder, name)))
+        for name in entries))
+
 def load_all_stock_data(data_folder="data"):
     """
-    Load all CSV files from the data folder.
-    
+    Load all stock data files (Parquet, with CSV as legacy fallback) from the data folder.
+
+    Results are cached on the folder's (filename, mtime) signature, so
+    running both strategies back-to-back parses each file once. Callers
+    treat the returned dictionary as read-only (they currently do).
+
     Args:
-        data_folder (str): Path to the folder containing CSV files.
-    
+        data_folder (str): Path to the folder containing the data files.
+
     Returns:
         dict: Dictionary with stock codes as keys and DataFrames as values.
     """
-    stock_data = {}
-    csv_files  = glob.glob(os.path.join(data_folder, "*.csv"))
-    
-    for file_path in csv_files:
+    return _load_all_stock_data_cached(data_folder, _data_folder_signature(data_folder))
+
+@lru_cache(maxsize=4)
+def _load_all_stock_data_cached(data_folder, signature):
+    stock_data    = {}
+    parquet_files = glob.glob(os.path.join(data_folder, "*.parquet"))
+    csv_files     = glob.glob(os.path.join(data_folder, "*.csv"))
+
+    for file_path in parquet_files:
         # Extract stock code from filename
+        filename   = os.path.basename(file_path)
+        stock_code = filename.replace('.parquet', '')
+
+        # Load the Parquet file (typed + columnar, no date parsing needed)
+        try:
+            df = pd.read_parquet(file_path)
+            stock_data[stock_code] = df
+            print(f"Loaded data for {stock_code}: {len(df)} records")
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
+
+    # Legacy fallback: CSV files from older downloads
+    for file_path in csv_files:
         filename   = os.path.basename(file_path)
         stock_code = filename.replace('.csv', '')
-        
-        # Load the CSV file
+
+        # Skip if a Parquet file for the same stock was already loaded
+        if stock_code in stock_data:
+            continue
+
         try:
-            df = pd.read_csv(file_path, index_col='Date', parse_dates=True)
+            if _HAVE_PYARROW:
+                df = pd.read_csv(file_path, index_col='Date', parse_dates=True, engine='pyarrow')
+                # The pyarrow engine parses dates as date objects; normalize
+                # to the DatetimeIndex the simulators expect
+                df.index = pd.to_datetime(df.index)
+            else:
+                df = pd.read_csv(file_path, index_col='Date', parse_dates=True)
             stock_data[stock_code] = df
             print(f"Loaded data for {stock_code}: {len(df)} records")
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
-    
+
+    return stock_data
+
+def build_stock_data_dict(close_data):
+    """
+    Build a stock-data dictionary from a wide close-price DataFrame.
+
+    Produces the same {stock_code: DataFrame} shape as load_all_stock_data,
+    so freshly downloaded data can feed the simulators directly without a
+    CSV round-trip.
+
+    Args:
+        close_data (pd.DataFrame): Close prices with one column per ticker.
+
+    Returns:
+        dict: Dictionary with stock codes as keys and DataFrames as values.
+    """
+    stock_data = {}
+
+    for ticker, series in close_data.items():
+        stock_code = ticker.replace('.JK', '')
+        stock_series = series.dropna()
+
+        # Handle: skip tickers with no data in the selected date range
+        if stock_series.empty:
+            continue
+        stock_data[stock_code] = stock_series.to_frame(name='Close')
+
     return stock_data
 
 def save_results_summary(results, output_file="results/simulation_summary.csv"):
@@ -48,29 +163,37 @@ def save_results_summary(results, output_file="results/simulation_summary.csv"):
     """
     # Create results directory if it doesn't exist
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    summary_data    = []
+
     initial_capital = 10000000  # Default initial capital
-    
+
+    # Collect columnar lists and build the DataFrame once at the end,
+    # computing the per-stock stats on raw NumPy arrays
+    stock_codes   = []
+    final_values  = []
+    total_returns = []
+    max_drawdowns = []
+    trading_days  = []
+
     for stock_code, portfolio_values in results.items():
-        final_value  = portfolio_values.iloc[-1]
+        arr          = portfolio_values.to_numpy()
+        final_value  = arr[-1]
         total_return = ((final_value - initial_capital) / initial_capital) * 100
-        
-        # Calculate maximum drawdown
-        cumulative_max = portfolio_values.cummax()
-        drawdown       = (portfolio_values - cumulative_max) / cumulative_max * 100
-        max_drawdown   = drawdown.min()
-        
-        summary_data.append({
-            'Stock_Code': stock_code,
-            'Initial_Capital': initial_capital,
-            'Final_Value': final_value,
-            'Total_Return_Percent': total_return,
-            'Max_Drawdown_Percent': max_drawdown,
-            'Trading_Days': len(portfolio_values)
-        })
-    
-    summary_df = pd.DataFrame(summary_data)
+
+        stock_codes.append(stock_code)
+        final_values.append(final_value)
+        total_returns.append(total_return)
+        # Maximum drawdown in a single fused pass over the array
+        max_drawdowns.append(max_drawdown(arr))
+        trading_days.append(len(arr))
+
+    summary_df = pd.DataFrame({
+        'Stock_Code': stock_codes,
+        'Initial_Capital': initial_capital,
+        'Final_Value': final_values,
+        'Total_Return_Percent': total_returns,
+        'Max_Drawdown_Percent': max_drawdowns,
+        'Trading_Days': trading_days
+    })
     summary_df = summary_df.sort_values('Total_Return_Percent', ascending=False)
     summary_df.to_csv(output_file, index=False)
     
@@ -87,13 +210,30 @@ def plot_portfolio_performance(results, stock_data_dict, output_folder="results"
         output_folder (str): Folder to save the plot images.
         use_multiprocess (bool): Legacy parameter, ignored (always runs sequentially).
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Create output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
-    
+
+    # Non-interactive backend: these plots are only ever written to disk
+    plt.switch_backend('Agg')
+
+    # Set the style once for all per-stock plots
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+
+    # Reuse a single figure across stocks instead of allocating one per plot
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    fig.subplots_adjust(hspace=0.3, left=0.09, right=0.97, top=0.95, bottom=0.07)
+
     # Process each stock sequentially
     for stock_code, portfolio_values in results.items():
-        create_single_stock_plot((stock_code, portfolio_values, stock_data_dict[stock_code], output_folder))
-    
+        create_single_stock_plot((stock_code, portfolio_values, stock_data_dict[stock_code], output_folder),
+                                 fig=fig, axes=(ax1, ax2))
+
+    plt.close(fig)
+
     # Create a combined comparison plot
     create_combined_portfolio_plot(results, output_folder)
 
@@ -105,15 +245,23 @@ def create_combined_portfolio_plot(results, output_folder="results"):
         results (dict): Dictionary with stock codes as keys and portfolio series as values.
         output_folder (str): Folder to save the plot images.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(14, 8))
     
     initial_capital = 10000000
     colors          = sns.color_palette("husl", len(results))
     
+    final_returns = {}
+
     for i, (stock_code, portfolio_values) in enumerate(results.items()):
-        # Calculate returns as percentage
-        returns = ((portfolio_values - initial_capital) / initial_capital) * 100
-        plt.plot(portfolio_values.index, returns, 
+        # Calculate returns as percentage (on the raw array, so both
+        # pd.Series and PortfolioResult inputs work)
+        values  = portfolio_values.to_numpy()
+        returns = ((values - initial_capital) / initial_capital) * 100
+        final_returns[stock_code] = returns[-1]
+        plt.plot(portfolio_values.index, returns,
                 label=f'{stock_code}', linewidth=2, color=colors[i], alpha=0.8)
     
     plt.axhline(y=0, color='black', linestyle='-', alpha=0.5, label='Break-even')
@@ -123,11 +271,10 @@ def create_combined_portfolio_plot(results, output_folder="results"):
     plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.grid(True, alpha=0.3)
     
-    # Add summary statistics as text
+    # Add summary statistics as text (final returns were computed above)
     stats_text = "Final Returns:\n"
-    for stock_code, portfolio_values in results.items():
-        final_return = ((portfolio_values.iloc[-1] - initial_capital) / initial_capital) * 100
-        stats_text  += f"{stock_code}: {final_return:.2f}%\n"
+    for stock_code, final_return in final_returns.items():
+        stats_text += f"{stock_code}: {final_return:.2f}%\n"
     
     plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes, 
              verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
@@ -148,12 +295,15 @@ def create_performance_summary_chart(results, output_folder="results"):
         results (dict): Dictionary with stock codes as keys and portfolio series as values.
         output_folder (str): Folder to save the plot images.
     """
+    import matplotlib.pyplot as plt
+
     initial_capital = 10000000
     stock_codes     = []
     returns         = []
     
     for stock_code, portfolio_values in results.items():
-        final_return = ((portfolio_values.iloc[-1] - initial_capital) / initial_capital) * 100
+        final_value  = portfolio_values.to_numpy()[-1]
+        final_return = ((final_value - initial_capital) / initial_capital) * 100
         stock_codes.append(stock_code)
         returns.append(final_return)
     
@@ -185,29 +335,42 @@ def create_performance_summary_chart(results, output_folder="results"):
     plt.savefig(filepath, dpi=300, bbox_inches='tight')
     plt.close()
 
-def create_single_stock_plot(args):
+def create_single_stock_plot(args, fig=None, axes=None):
     """
     Create a plot for a single stock.
-    
+
     Args:
         args (tuple): (stock_code, portfolio_values, stock_data, output_folder)
-    
+        fig: Optional figure to draw on (reused across stocks by the caller).
+        axes (tuple): Optional (ax1, ax2) axes belonging to fig.
+
     Returns:
         str: Path to the saved plot file
     """
     stock_code, portfolio_values, stock_data, output_folder = args
-    
-    # Set the style for better-looking plots
-    plt.style.use('seaborn-v0_8')
-    sns.set_palette("husl")
-    
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-    
-    # Plot 1: Stock Price and SMA
-    stock_data['SMA'] = stock_data['Close'].rolling(window=5).mean()
-    
-    ax1.plot(stock_data.index, stock_data['Close'], label='Stock Price', linewidth=2, alpha=0.8)
-    ax1.plot(stock_data.index, stock_data['SMA'], label='SMA (5 days)', linewidth=2, alpha=0.8)
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Handle: standalone call without a shared figure
+    own_figure = fig is None
+    if own_figure:
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+        fig.subplots_adjust(hspace=0.3, left=0.09, right=0.97, top=0.95, bottom=0.07)
+    else:
+        ax1, ax2 = axes
+        ax1.clear()
+        ax2.clear()
+
+    # Plot 1: Stock Price and SMA (materialize the Close column only once)
+    close = stock_data['Close']
+    sma   = pd.Series(rolling_mean(close.to_numpy(dtype=np.float64), 5),
+                      index=stock_data.index)
+
+    ax1.plot(stock_data.index, close, label='Stock Price', linewidth=2, alpha=0.8)
+    ax1.plot(stock_data.index, sma, label='SMA (5 days)', linewidth=2, alpha=0.8)
     ax1.set_title(f'{stock_code} - Stock Price and Moving Average', fontsize=14, fontweight='bold')
     ax1.set_ylabel('Price (IDR)', fontsize=12)
     ax1.legend()
@@ -225,13 +388,12 @@ def create_single_stock_plot(args):
     
     # Format y-axis to show values in millions
     ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
-    
-    plt.tight_layout()
-    
-    # Save the plot
+
+    # Save the plot (margins are pre-set, so no bbox_inches='tight' re-render)
     filename = f'{stock_code}_portfolio_analysis.png'
     filepath = os.path.join(output_folder, filename)
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
-    plt.close()
-    
+    fig.savefig(filepath, dpi=150)
+    if own_figure:
+        plt.close(fig)
+
     return filepath
\ No newline at end of file
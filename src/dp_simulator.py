@@ -4,188 +4,154 @@
 # IMPORTS
 import pandas as pd
 import numpy as np
-import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
-import functools
-from .data_manager import load_all_stock_data
+from .data_manager import load_all_stock_data, PortfolioResult
+from .parallel import attach_stock_data, map_stock_simulations
 
 # FUNCTION DEFINITIONS
 def process_single_stock_dp(args):
     """
     Process a single stock with Dynamic Programming algorithm.
-    
+
+    Workers run the simulator silently and hand the log lines back, so the
+    parent can print them serially instead of interleaving worker writes
+    through one stdout pipe.
+
     Args:
-        args (tuple): (stock_code, stock_df, initial_capital)
-    
+        args (tuple): (stock_code, stock_data, initial_capital) where
+                      stock_data is either a DataFrame or a shared-memory
+                      spec from share_stock_data.
+
     Returns:
-        tuple: (stock_code, portfolio_values)
+        tuple: (stock_code, portfolio_values, log_lines)
     """
-    stock_code, stock_df, initial_capital = args
-    
-    portfolio_values = dynamic_programming_simulator(stock_df, initial_capital)
-    
-    return stock_code, portfolio_values
+    stock_code, stock_data, initial_capital = args
+
+    # Handle: in the multiprocessing path the stock data arrives as a
+    # shared-memory spec instead of a pickled DataFrame
+    if not isinstance(stock_data, pd.DataFrame):
+        stock_data = attach_stock_data(stock_data)
+
+    log_lines        = []
+    portfolio_values = dynamic_programming_simulator(stock_data, initial_capital,
+                                                     verbose=False, log=log_lines)
+
+    return stock_code, portfolio_values, log_lines
 
-def run_dp_simulations(data_folder="data", initial_capital=10000000, use_multiprocess=False):
+def run_dp_simulations(data_folder="data", initial_capital=10000000, use_multiprocess=True, preloaded=None):
     """
-    Run Dynamic Programming simulation on all stocks in the data folder sequentially.
-    
+    Run Dynamic Programming simulation on all stocks in the data folder.
+
     Args:
         data_folder (str): Path to the folder containing CSV files.
         initial_capital (float): Initial capital for trading.
-        use_multiprocess (bool): Legacy parameter, ignored (always runs sequentially).
-    
+        use_multiprocess (bool): Run one worker process per stock (each stock's
+                                 simulation is independent). Falls back to
+                                 sequential for a single stock.
+        preloaded (dict): Optional {stock_code: DataFrame} already in memory;
+                          skips reading the data folder when provided.
+
     Returns:
-        tuple: (results_dict, stock_data_dict) where results_dict contains portfolio series 
+        tuple: (results_dict, stock_data_dict) where results_dict contains portfolio series
                and stock_data_dict contains the original stock data for plotting.
     """
-    all_stock_data = load_all_stock_data(data_folder)
-    results        = {}
-    
+    all_stock_data = preloaded if preloaded is not None else load_all_stock_data(data_folder)
+
     if not all_stock_data:
-        return results, all_stock_data
-    
-    # Process each stock sequentially
-    for stock_code, stock_df in all_stock_data.items():
-        stock_code, portfolio_values = process_single_stock_dp(
-            (stock_code, stock_df, initial_capital)
-        )
-        results[stock_code] = portfolio_values
-    
+        return {}, all_stock_data
+
+    results = map_stock_simulations(all_stock_data, process_single_stock_dp,
+                                    (initial_capital,), use_multiprocess)
+
     return results, all_stock_data
 
-def dynamic_programming_simulator(stock_data, initial_capital=10000000):
+def dynamic_programming_simulator(stock_data, initial_capital=10000000, dtype=np.float32, verbose=True, log=None):
     """
-    Simulate investment strategy using Dynamic Programming approach.
+    Simulate the optimal all-in trading strategy (Dynamic Programming model).
+
+    The DP recurrence cash[i]/hold[i] = max(...) is multiplicative with no
+    transaction costs, so its optimum collapses to a closed form: be long
+    during every rise, i.e. buy at each local minimum and sell at the next
+    local maximum. That lets the whole forward pass plus backward
+    reconstruction be replaced by one vectorized scan over the price
+    differences — no state arrays and no epsilon-compare heuristics.
+
+    Prices are scanned in `dtype` (float32 by default, which halves memory
+    traffic and is plenty for ~6 significant digits of price data; pass
+    np.float64 for full precision). The trading simulation below always
+    accumulates cash in float64.
+
+    `verbose` prints the trade log to stdout (workers pass False so stdout
+    stays out of the parallel path); `log`, when given, receives the same
+    lines either way.
     """
-    print("Running DP strategy (Realistic model)...")
-    
-    prices = stock_data['Close'].to_numpy()
+    lines = ["Running DP strategy (Realistic model)..."]
+
+    def _flush():
+        if log is not None:
+            log.extend(lines)
+        if verbose:
+            for line in lines:
+                print(line)
+
+    prices = stock_data['Close'].to_numpy(dtype=dtype)
     n = len(prices)
     if n < 2:
-        return pd.Series([initial_capital] * n, index=stock_data.index)
-
-    # DYNAMIC PROGRAMMING APPROACH FOR ALL-IN TRADING
-
-    # State variables for each day:
-    # cash[i] = maximum cash we can have on day i (not holding any stock)
-    # hold[i] = maximum value we can have on day i (holding stock)
-    
-    cash = np.zeros(n)
-    hold = np.zeros(n)
-    
-    # Base case: Day 0
-    cash[0] = initial_capital
-    hold[0] = 0  # Can't hold stock on day 0 without buying
-    
-    # Forward pass: Calculate optimal values for all-in trading
-    for i in range(1, n):
-        price = prices[i]
-        prev_price = prices[i-1]
-        
-        # Option 1: Stay in cash (no action)
-        cash_stay = cash[i-1]
-        
-        # Option 2: Sell all holdings (if we had any)
-        cash_sell = 0
-        if hold[i-1] > 0:
-            # Value of holdings adjusts with price change
-            cash_sell = hold[i-1] * price / prev_price
-        
-        cash[i] = max(cash_stay, cash_sell)
-        
-        # Option 1: Keep holding (value adjusts with price)
-        hold_keep = 0
-        if hold[i-1] > 0:
-            hold_keep = hold[i-1] * price / prev_price
-        
-        # Option 2: Buy all-in with yesterday's cash
-        hold_buy = cash[i-1]
-        
-        hold[i] = max(hold_keep, hold_buy)
-    
-    # RECONSTRUCT OPTIMAL PATH
-    # Work backwards to find the actual buy/sell sequence
-    transactions = []
-    i = n - 1
-    
-    # Determine final state - choose the better option
-    if cash[n-1] > hold[n-1]:
-        current_state = 'cash'
-    else:
-        current_state = 'hold'
-        # Add final sell transaction
-        transactions.append(('sell', n-1, prices[n-1]))
-    
-    while i > 0:
-        price = prices[i]
-        prev_price = prices[i-1]
-        
-        if current_state == 'cash':
-            # Check if we got here by selling
-            if hold[i-1] > 0:
-                cash_from_sell = hold[i-1] * price / prev_price
-                if abs(cash[i] - cash_from_sell) < abs(cash[i] - cash[i-1]):
-                    transactions.append(('sell', i, price))
-                    current_state = 'hold'
-        else:  # current_state == 'hold'
-            # Check if we got here by buying
-            if abs(hold[i] - cash[i-1]) < 1e-6:
-                transactions.append(('buy', i, price))
-                current_state = 'cash'
-        i -= 1
-    
-    transactions.reverse()
-    
+        _flush()
+        return PortfolioResult(np.full(n, float(initial_capital)), stock_data.index)
+
+    # OPTIMAL BUY/SELL DAYS VIA LOCAL EXTREMA
+    # A rise is a maximal run of positive day-to-day differences; pad the
+    # run mask so np.diff marks where each run starts (+1 = buy day) and
+    # ends (-1 = sell day).
+    rising = np.concatenate(([0], (np.diff(prices) > 0).astype(np.int8), [0]))
+    edges  = np.diff(rising)
+    buys   = np.flatnonzero(edges == 1)
+    sells  = np.flatnonzero(edges == -1)
+
+    # The DP base case is hold[0] = 0 (no position on day 0), so a rise that
+    # starts on day 0 is entered on day 1 instead — and dropped entirely if
+    # it has already peaked by then
+    if buys.size and buys[0] == 0:
+        if sells[0] <= 1:
+            buys, sells = buys[1:], sells[1:]
+        else:
+            buys = buys.copy()
+            buys[0] = 1
+
     # SIMULATE ACTUAL TRADING
-    current_cash = initial_capital
-    current_shares = 0
-    portfolio_values = [initial_capital]
-    
-    transaction_idx = 0
-    
-    for i in range(1, n):
-        price = prices[i]
-        date_str = stock_data.index[i].strftime('%Y-%m-%d')
-        
-        if transaction_idx < len(transactions) and transactions[transaction_idx][1] == i:
-            action, day, transaction_price = transactions[transaction_idx]
-            
-            if action == 'buy' and current_shares == 0:
-                # Buy as many shares as possible
-                shares_to_buy = current_cash // price
-                if shares_to_buy > 0:
-                    cost = shares_to_buy * price
-                    current_cash -= cost
-                    current_shares += shares_to_buy
-                    print(f"{date_str}: Bought {shares_to_buy:.0f} shares at {price:.2f}, Cash left: {current_cash:.2f}")
-            
-            elif action == 'sell' and current_shares > 0:
-                # Sell all shares
-                sale_value = current_shares * price
-                current_cash += sale_value
-                print(f"{date_str}: Sold {current_shares:.0f} shares at {price:.2f}, Cash now: {current_cash:.2f}")
-                current_shares = 0
-            
-            transaction_idx += 1
-        
-        # Calculate portfolio value (cash + stock value)
-        portfolio_value = current_cash + (current_shares * price)
-        portfolio_values.append(portfolio_value)
-    
-    # Sell any remaining shares at the end
-    if current_shares > 0:
-        final_price = prices[-1]
-        sale_value = current_shares * final_price
-        current_cash += sale_value
-        date_str = stock_data.index[-1].strftime('%Y-%m-%d')
-        print(f"{date_str}: Final sale - Sold {current_shares:.0f} shares at {final_price:.2f}, Final cash: {current_cash:.2f}")
-        portfolio_values[-1] = current_cash
+    # The portfolio value only changes shape at trade events: it is flat cash
+    # between positions and cash + shares * price while long. So instead of a
+    # per-day Python loop — or an intermediate transaction list — loop once
+    # over the (few) buy/sell pairs (buys[k] < sells[k], every buy has a
+    # matching sell) and fill each segment of the value array with one
+    # vectorized assignment.
+    portfolio_values = np.full(n, float(initial_capital))
+    current_cash     = float(initial_capital)
+
+    for buy_day, sell_day in zip(buys, sells):
+        # Buy as many shares as possible
+        buy_price     = float(prices[buy_day])
+        shares_to_buy = int(current_cash // buy_price)
+        if shares_to_buy == 0:
+            continue
+
+        current_cash -= shares_to_buy * buy_price
+        date_str      = stock_data.index[buy_day].strftime('%Y-%m-%d')
+        lines.append(f"{date_str}: Bought {shares_to_buy:.0f} shares at {buy_price:.2f}, Cash left: {current_cash:.2f}")
+
+        # Mark the long segment to market, then sell all shares
+        sell_price = float(prices[sell_day])
+        portfolio_values[buy_day:sell_day] = \
+            current_cash + shares_to_buy * prices[buy_day:sell_day].astype(np.float64)
+        current_cash += shares_to_buy * sell_price
+        date_str      = stock_data.index[sell_day].strftime('%Y-%m-%d')
+        lines.append(f"{date_str}: Sold {shares_to_buy:.0f} shares at {sell_price:.2f}, Cash now: {current_cash:.2f}")
+        # Flat in cash from the sell day onwards (until the next event)
+        portfolio_values[sell_day:] = current_cash
 
     final_value = portfolio_values[-1]
-    print(f"Final Portfolio Value: {final_value:,.0f}")
-    print(f"Total Return: {((final_value / initial_capital) - 1) * 100:.2f}%")
-    
-    return pd.Series(portfolio_values, index=stock_data.index)
\ No newline at end of file
+    lines.append(f"Final Portfolio Value: {final_value:,.0f}")
+    lines.append(f"Total Return: {((final_value / initial_capital) - 1) * 100:.2f}%")
+    _flush()
+
+    return PortfolioResult(portfolio_values, stock_data.index)
\ No newline at end of file
@@ -4,60 +4,310 @@
 # IMPORTS
 import pandas as pd
 import numpy as np
-import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
-import functools
+import math
+
+# Handle: Numba is optional, fall back to plain Python on NumPy arrays
+try:
+    import numba
+except ImportError:
+    numba = None
+
 from .data_manager import load_all_stock_data
+from .parallel import attach_stock_data, map_stock_simulations
+from .rolling import rolling_mean
 
 # FUNCTION DEFINITIONS
+def _greedy_core_py(close, sma, initial_capital):
+    """
+    Daily loop of the greedy trading state machine on raw arrays.
+
+    No printing happens here (so Numba can compile it in nopython mode);
+    trade events are recorded into parallel arrays for the caller to log.
+
+    Args:
+        close (np.ndarray): Closing prices as a float64 array.
+        sma (np.ndarray): Simple Moving Average values (NaN while warming up).
+        initial_capital (float): Initial capital for trading.
+
+    Returns:
+        tuple: (portfolio_values, actions, traded_shares) where actions[i] is
+               +1 for a buy on day i, -1 for a sell, 0 otherwise, and
+               traded_shares[i] is the number of shares moved that day.
+    """
+    n       = close.shape[0]
+    out     = np.empty(n)
+    actions = np.zeros(n, dtype=np.int8)
+    traded  = np.zeros(n)
+    cash    = initial_capital
+    shares  = 0.0
+
+    # Loop: Trading Simulation (Iterate Daily)
+    for i in range(n):
+        s = sma[i]
+
+        # Handle: if SMA is NaN, skip the iteration (for the first few days)
+        # (math.isnan avoids the ufunc dispatch on a scalar)
+        if math.isnan(s):
+            out[i] = initial_capital
+            continue
+
+        p = close[i]
+
+        # Buy: If price is above SMA and we don't hold the stock, buy shares
+        if p > s and shares == 0.0:
+            # Buy: Go all in
+            q          = np.floor(cash / p)
+            cash      -= q * p
+            shares    += q
+            actions[i] = 1
+            traded[i]  = q
+
+        # Sell: If price is below SMA and we hold the stock, sell shares
+        elif p < s and shares > 0.0:
+            # Sell: Go all out
+            cash      += shares * p
+            actions[i] = -1
+            traded[i]  = shares
+            shares     = 0.0
+
+        out[i] = cash + shares * p
+
+    return out, actions, traded
+
+def _greedy_core_numpy(close, sma, initial_capital):
+    """
+    Vectorized equivalent of _greedy_core_py (used when Numba is missing).
+
+    The state machine has only two states driven by the close/SMA comparison,
+    so the held position can be derived without a per-day loop: it is the
+    forward fill of the comparison's sign (ties and the NaN warm-up keep the
+    previous state), and the buy/sell days are the edges of that mask. The
+    portfolio value is then filled per long segment, so the only remaining
+    Python loop runs over the (few) trades instead of every day.
+
+    Args:
+        close (np.ndarray): Closing prices as a float64 array.
+        sma (np.ndarray): Simple Moving Average values (NaN while warming up).
+        initial_capital (float): Initial capital for trading.
+
+    Returns:
+        tuple: Same (portfolio_values, actions, traded_shares) as the loop core.
+    """
+    n       = close.shape[0]
+    out     = np.full(n, initial_capital)
+    actions = np.zeros(n, dtype=np.int8)
+    traded  = np.zeros(n)
+
+    # Signal: +1 above the SMA, -1 below, 0 on ties and during warm-up
+    sign  = np.zeros(n, dtype=np.int8)
+    valid = ~np.isnan(sma)
+    sign[valid & (close > sma)] = 1
+    sign[valid & (close < sma)] = -1
+
+    # Position: forward-fill the last non-zero signal via a running maximum
+    # over its indices; we are long wherever that fill is +1
+    last    = np.maximum.accumulate(np.where(sign != 0, np.arange(n), -1))
+    is_long = np.where(last >= 0, sign[np.maximum(last, 0)], 0) == 1
+
+    # Buy/sell days are the edges of the long mask (a trailing sell index of
+    # n means the position is still open on the last day)
+    edges = np.diff(np.concatenate(([0], is_long.astype(np.int8), [0])))
+    buys  = np.flatnonzero(edges == 1)
+    sells = np.flatnonzero(edges == -1)
+
+    cash = initial_capital
+    for buy_day, sell_day in zip(buys, sells):
+        # Whole-share sizing (int truncation equals floor for the positive
+        # quotient). Match the loop core when one share is unaffordable:
+        # every strict above-SMA day still records a zero-share buy, and
+        # the position opens on the first day the price fits the cash
+        q = 0
+        j = buy_day
+        while j < sell_day:
+            if close[j] > sma[j]:
+                actions[j] = 1
+                q = int(cash / close[j])
+                if q > 0:
+                    break
+            j += 1
+        if q == 0:
+            continue
+
+        cash          -= q * close[j]
+        traded[j]      = q
+        out[j:sell_day] = cash + q * close[j:sell_day]
+
+        if sell_day < n:
+            cash             += q * close[sell_day]
+            actions[sell_day] = -1
+            traded[sell_day]  = q
+            out[sell_day:]    = cash
+
+    return out, actions, traded
+
+# Compile the loop core when Numba is available, otherwise use the
+# vectorized NumPy version. Explicit signatures compile at import with known
+# types; inputs are declared readonly because pandas' to_numpy can return a
+# read-only view.
+if numba is not None:
+    _RO_F8 = numba.types.Array(numba.types.float64, 1, 'C', readonly=True)
+    _RO_F4 = numba.types.Array(numba.types.float32, 1, 'C', readonly=True)
+    _GREEDY_RESULT = numba.types.Tuple((
+        numba.types.float64[:], numba.types.int8[:], numba.types.float64[:]))
+    # Prices may arrive as float32 (half the bandwidth) or float64; the SMA
+    # and all cash accounting stay float64 either way
+    _greedy_core = numba.njit(
+        [_GREEDY_RESULT(_RO_F8, _RO_F8, numba.types.float64),
+         _GREEDY_RESULT(_RO_F4, _RO_F8, numba.types.float64)],
+        cache=True,
+    )(_greedy_core_py)
+else:
+    _greedy_core = _greedy_core_numpy
+
+def _trade_log_lines(index, close, out, actions, traded):
+    """
+    Format the trade events recorded by a greedy core into log lines.
+
+    Args:
+        index (pd.DatetimeIndex): Date index of the simulated stock.
+        close (np.ndarray): Closing prices.
+        out (np.ndarray): Portfolio values from the core.
+        actions (np.ndarray): +1 buy / -1 sell markers from the core.
+        traded (np.ndarray): Shares moved per day from the core.
+
+    Returns:
+        list: The log lines, ending with the final portfolio value.
+    """
+    lines = []
+    for i in np.flatnonzero(actions):
+        price = close[i]
+        if actions[i] == 1:
+            cash_after = out[i] - traded[i] * price
+            lines.append(f"{index[i].date()}: Bought {traded[i]} shares at {price:.2f}, Cash left: {cash_after:.2f}")
+        else:
+            lines.append(f"{index[i].date()}: Sold {traded[i]} shares at {price:.2f}, Cash now: {out[i]:.2f}")
+    lines.append(f"Final Portfolio Value: {out[-1]:.2f}")
+    return lines
+
+def _run_greedy_batched(all_stock_data, initial_capital, sma_window):
+    """
+    Batched single-process run for stocks sharing one date index.
+
+    Stacks every close column into an (n_days, n_stocks) float32 matrix in
+    Fortran order (so each column stays contiguous) and computes all SMAs
+    with one column-wise prefix sum, amortizing the NumPy dispatch across
+    stocks. The per-stock core then runs on contiguous column views — for
+    a handful of stocks this beats the worker-pool overhead outright.
+
+    Args:
+        all_stock_data (dict): Dictionary of {stock_code: DataFrame}.
+        initial_capital (float): Initial capital for trading.
+        sma_window (int): Window size for the Simple Moving Average.
+
+    Returns:
+        dict or None: {stock_code: (portfolio_series, log_lines)}, or None
+                      when the date indexes differ and batching won't apply.
+    """
+    stock_codes = list(all_stock_data)
+    index       = all_stock_data[stock_codes[0]].index
+
+    # Handle: batching needs one common date axis
+    for stock_code in stock_codes[1:]:
+        if not all_stock_data[stock_code].index.equals(index):
+            return None
+
+    n_days   = len(index)
+    n_stocks = len(stock_codes)
+    close_2d = np.asfortranarray(np.column_stack(
+        [all_stock_data[stock_code]['Close'].to_numpy(dtype=np.float32)
+         for stock_code in stock_codes]))
+
+    # All SMAs in one shot: column-wise prefix sum, accumulated in float64
+    sma_2d = np.full((n_days, n_stocks), np.nan, order='F')
+    if n_days >= sma_window:
+        cs = np.cumsum(close_2d, axis=0, dtype=np.float64)
+        sma_2d[sma_window - 1:] = (cs[sma_window - 1:] - np.vstack(
+            (np.zeros((1, n_stocks)), cs[:-sma_window]))) / sma_window
+
+    results = {}
+    for j, stock_code in enumerate(stock_codes):
+        close_col = close_2d[:, j]
+        out, actions, traded = _greedy_core(close_col, sma_2d[:, j], float(initial_capital))
+        results[stock_code] = (pd.Series(out, index=index, copy=False),
+                               _trade_log_lines(index, close_col, out, actions, traded))
+
+    return results
+
 def process_single_stock_greedy(args):
     """
     Process a single stock with greedy algorithm.
-    
+
+    Workers run the simulator silently and hand the log lines back, so the
+    parent can print them serially instead of interleaving worker writes
+    through one stdout pipe.
+
     Args:
-        args (tuple): (stock_code, stock_df, initial_capital, sma_window)
-    
+        args (tuple): (stock_code, stock_data, initial_capital, sma_window)
+                      where stock_data is either a DataFrame or a
+                      shared-memory spec from share_stock_data.
+
     Returns:
-        tuple: (stock_code, portfolio_values)
+        tuple: (stock_code, portfolio_values, log_lines)
     """
-    stock_code, stock_df, initial_capital, sma_window = args
-    
-    portfolio_values = greedy_simulator(stock_df, initial_capital, sma_window)
-    
-    return stock_code, portfolio_values
+    stock_code, stock_data, initial_capital, sma_window = args
+
+    # Handle: in the multiprocessing path the stock data arrives as a
+    # shared-memory spec instead of a pickled DataFrame
+    if not isinstance(stock_data, pd.DataFrame):
+        stock_data = attach_stock_data(stock_data)
 
-def run_greedy_simulations(data_folder="data", initial_capital=10000000, sma_window=5, use_multiprocess=False):
+    log_lines        = []
+    portfolio_values = greedy_simulator(stock_data, initial_capital, sma_window,
+                                        verbose=False, log=log_lines)
+
+    return stock_code, portfolio_values, log_lines
+
+def run_greedy_simulations(data_folder="data", initial_capital=10000000, sma_window=5, use_multiprocess=True, preloaded=None):
     """
-    Run greedy simulation on all stocks in the data folder sequentially.
-    
+    Run greedy simulation on all stocks in the data folder.
+
     Args:
         data_folder (str): Path to the folder containing CSV files.
         initial_capital (float): Initial capital for trading.
         sma_window (int): Window size for the Simple Moving Average.
-        use_multiprocess (bool): Legacy parameter, ignored (always runs sequentially).
-    
+        use_multiprocess (bool): Run one worker process per stock (each stock's
+                                 simulation is independent). Falls back to
+                                 sequential for a single stock.
+        preloaded (dict): Optional {stock_code: DataFrame} already in memory;
+                          skips reading the data folder when provided.
+
     Returns:
-        tuple: (results_dict, stock_data_dict) where results_dict contains portfolio series 
+        tuple: (results_dict, stock_data_dict) where results_dict contains portfolio series
                and stock_data_dict contains the original stock data for plotting.
     """
-    all_stock_data = load_all_stock_data(data_folder)
+    all_stock_data = preloaded if preloaded is not None else load_all_stock_data(data_folder)
     results        = {}
-    
+
     if not all_stock_data:
         return results, all_stock_data
-    
-    # Process each stock sequentially
-    for stock_code, stock_df in all_stock_data.items():
-        stock_code, portfolio_values = process_single_stock_greedy(
-            (stock_code, stock_df, initial_capital, sma_window)
-        )
-        results[stock_code] = portfolio_values
-    
+
+    # Batched path: when every stock shares one date index, a single-process
+    # 2D pass over all stocks is cheaper than any pool dispatch
+    if len(all_stock_data) > 1:
+        batched = _run_greedy_batched(all_stock_data, initial_capital, sma_window)
+        if batched is not None:
+            for stock_code, (portfolio_values, log_lines) in batched.items():
+                results[stock_code] = portfolio_values
+                for line in log_lines:
+                    print(line)
+            return results, all_stock_data
+
+    results = map_stock_simulations(all_stock_data, process_single_stock_greedy,
+                                    (initial_capital, sma_window), use_multiprocess)
+
     return results, all_stock_data
 
-def greedy_simulator(stock_data, initial_capital=10000000, sma_window=5):
+def greedy_simulator(stock_data, initial_capital=10000000, sma_window=5, verbose=True, log=None, dtype=np.float32):
     """
     Simulate a greedy trading strategy on stock data.
 
@@ -78,48 +328,36 @@ def greedy_simulator(stock_data, initial_capital=10000000, sma_window=5):
         stock_data (pd.DataFrame): DataFrame containing stock closing prices.
         initial_capital (float): Initial capital for trading.
         sma_window (int): Window size for the Simple Moving Average (SMA).
+        verbose (bool): Print the trade log to stdout. Workers pass False so
+                        stdout stays out of the parallel path.
+        log (list): Optional list that receives the trade log lines, printed
+                    or not.
+        dtype (np.dtype): Price scan dtype. float32 halves the bytes moved
+                          and carries ~7 significant digits — ample for
+                          2-decimal prices; pass np.float64 for full
+                          precision. The SMA and all cash accounting stay
+                          float64 regardless.
 
     Returns:
         pd.Series: Series containing the portfolio value over time.
     """
 
-    data             = stock_data.copy()
-    data['SMA']      = data['Close'].rolling(window=sma_window).mean()
-    cash             = initial_capital
-    shares           = 0
-    portfolio_values = []
+    # SMA as a local array via the O(n) rolling-sum kernel; no pandas
+    # rolling machinery and no extra DataFrame column, so the input
+    # DataFrame never needs to be copied
+    close_arr   = stock_data['Close'].to_numpy(dtype=dtype)
+    sma_arr     = rolling_mean(close_arr, sma_window)
 
-    # Loop: Trading Simulation (Iterate Daily)
-    for i in range(len(data)):
-
-        # Handle: if SMA is NaN, skip the iteration (for the first few days)
-        if np.isnan(data['SMA'].iloc[i]):
-            portfolio_values.append(initial_capital)
-            continue
-
-        price_today = data['Close'].iloc[i]
-        sma_today   = data['SMA'].iloc[i]
+    out, actions, traded = _greedy_core(close_arr, sma_arr, float(initial_capital))
 
-        # Buy: If price is above SMA and we don't hold the stock, buy shares
-        if price_today > sma_today and shares == 0:
-            # Buy: Go all in
-            shares_to_buy = cash // price_today
-            cost          = shares_to_buy * price_today
-            cash         -= cost
-            shares       += shares_to_buy
-            print(f"{data.index[i].date()}: Bought {shares_to_buy} shares at {price_today:.2f}, Cash left: {cash:.2f}")
-        
-        # Sell: If price is below SMA and we hold the stock, sell shares
-        elif price_today < sma_today and shares > 0:
-            # Sell: Go all out
-            sale_value = shares * price_today
-            cash      += sale_value
-            print(f"{data.index[i].date()}: Sold {shares} shares at {price_today:.2f}, Cash now: {cash:.2f}")
-            shares     = 0
+    # Log the trade events recorded by the core (outside the hot loop)
+    lines = _trade_log_lines(stock_data.index, close_arr, out, actions, traded)
 
-        current_portfolio_value = cash + (shares * price_today)
-        portfolio_values.append(current_portfolio_value)
+    if log is not None:
+        log.extend(lines)
+    if verbose:
+        for line in lines:
+            print(line)
 
-    print(f"Final Portfolio Value: {portfolio_values[-1]:.2f}")
-    return pd.Series(portfolio_values, index=data.index)
-    return summary_df
\ No newline at end of file
+    # Zero-copy wrap: the core's output array backs the Series directly
+    return pd.Series(out, index=stock_data.index, copy=False)
\ No newline at end of file
@@ -0,0 +1,159 @@
+# src/parallel.py
+# Kaindra
+
+# IMPORTS
+import atexit
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+# STATIC DEFINITIONS
+_executor = None
+
+# FUNCTION DEFINITIONS
+def get_executor():
+    """
+    Return the shared, lazily created worker pool.
+
+    Spawning a ProcessPoolExecutor per run_*_simulations call pays worker
+    start-up (and a cold Numba dispatch per worker) every time; reusing one
+    pool keeps the workers — and their warmed JIT caches — alive across the
+    greedy and DP runs. The pool is shut down at interpreter exit.
+
+    Returns:
+        ProcessPoolExecutor: The shared worker pool.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        atexit.register(_shutdown_executor)
+    return _executor
+
+def _shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+def share_stock_data(all_stock_data):
+    """
+    Copy each stock's close prices and date index into shared memory.
+
+    Sending a DataFrame to a worker process pickles the whole frame per
+    task; instead each stock gets one SharedMemory block holding its close
+    prices (float64) followed by its dates (int64 nanoseconds), and workers
+    receive only the tiny (name, length) spec.
+
+    Args:
+        all_stock_data (dict): Dictionary of {stock_code: DataFrame}.
+
+    Returns:
+        tuple: (specs, segments) where specs maps stock codes to the
+               (shm_name, n_days) spec for attach_stock_data, and segments
+               holds the SharedMemory blocks to close and unlink when the
+               workers are done.
+    """
+    specs    = {}
+    segments = []
+
+    for stock_code, stock_df in all_stock_data.items():
+        close = stock_df['Close'].to_numpy(dtype=np.float64)
+        # Normalize to nanoseconds: asi8 is resolution-dependent (CSV-loaded
+        # indexes can be datetime64[s]), and attach views the ints as ns
+        dates = stock_df.index.as_unit('ns').asi8
+        n     = close.shape[0]
+
+        shm = shared_memory.SharedMemory(create=True, size=n * 16)
+        np.ndarray(n, dtype=np.float64, buffer=shm.buf[:n * 8])[:]  = close
+        np.ndarray(n, dtype=np.int64, buffer=shm.buf[n * 8:])[:]    = dates
+
+        specs[stock_code] = (shm.name, n)
+        segments.append(shm)
+
+    return specs, segments
+
+def attach_stock_data(spec):
+    """
+    Rebuild a stock DataFrame from a shared-memory spec inside a worker.
+
+    The arrays are copied out of the shared pages (one memcpy, versus a
+    full pickle round-trip), so the block does not need to stay open for
+    the DataFrame's lifetime.
+
+    Args:
+        spec (tuple): (shm_name, n_days) as produced by share_stock_data.
+
+    Returns:
+        pd.DataFrame: The reconstructed stock DataFrame.
+    """
+    shm_name, n = spec
+    shm         = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        close = np.ndarray(n, dtype=np.float64, buffer=shm.buf[:n * 8]).copy()
+        dates = np.ndarray(n, dtype=np.int64, buffer=shm.buf[n * 8:]).copy()
+    finally:
+        shm.close()
+
+    return pd.DataFrame(
+        {'Close': close},
+        index=pd.DatetimeIndex(dates.view('datetime64[ns]')),
+    )
+
+def release_stock_data(segments):
+    """
+    Close and unlink the shared-memory blocks created by share_stock_data.
+
+    Args:
+        segments (list): SharedMemory blocks to release.
+    """
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+
+def map_stock_simulations(all_stock_data, worker, extra_args, use_multiprocess=True):
+    """
+    Run a per-stock worker over every stock, in parallel when it pays.
+
+    The single dispatch point shared by run_greedy_simulations and
+    run_dp_simulations: parallel runs hand the price arrays to the pool
+    through shared memory, sequential runs (or a single stock) pass the
+    DataFrames directly, and either way each stock's log lines are printed
+    serially here in the parent.
+
+    Args:
+        all_stock_data (dict): Dictionary of {stock_code: DataFrame}.
+        worker (callable): Module-level function taking one
+                           (stock_code, stock_data, *extra_args) tuple and
+                           returning (stock_code, result, log_lines).
+        extra_args (tuple): Trailing arguments packed into each task tuple.
+        use_multiprocess (bool): Run one worker process per stock.
+
+    Returns:
+        dict: Dictionary of {stock_code: result}.
+    """
+    results = {}
+
+    if use_multiprocess and len(all_stock_data) > 1:
+        specs, segments = share_stock_data(all_stock_data)
+        try:
+            executor = get_executor()
+            futures  = [executor.submit(worker, (stock_code, spec) + extra_args)
+                        for stock_code, spec in specs.items()]
+            for future in as_completed(futures):
+                stock_code, result, log_lines = future.result()
+                results[stock_code] = result
+                for line in log_lines:
+                    print(line)
+        finally:
+            release_stock_data(segments)
+    else:
+        for stock_code, stock_df in all_stock_data.items():
+            stock_code, result, log_lines = worker((stock_code, stock_df) + extra_args)
+            results[stock_code] = result
+            for line in log_lines:
+                print(line)
+
+    return results
@@ -0,0 +1,117 @@
+# src/rolling.py
+# Kaindra
+
+# IMPORTS
+import os
+import numpy as np
+
+# Handle: Numba is optional, fall back to a vectorized NumPy implementation
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# FUNCTION DEFINITIONS
+def _rolling_mean_numba(x, w):
+    """
+    Online rolling mean over a float64 array.
+
+    Maintains a running window sum so each element costs one add and one
+    subtract, instead of pandas' generic rolling machinery.
+
+    Args:
+        x (np.ndarray): Input values as a float64 array.
+        w (int): Window size.
+
+    Returns:
+        np.ndarray: Rolling mean, NaN for the first w-1 indices.
+    """
+    n = x.shape[0]
+    out = np.empty(n)
+    running_sum = 0.0
+
+    for i in range(n):
+        running_sum += x[i]
+        if i >= w:
+            running_sum -= x[i - w]
+        if i >= w - 1:
+            out[i] = running_sum / w
+        else:
+            out[i] = np.nan
+
+    return out
+
+def _rolling_mean_numpy(x, w):
+    """
+    Vectorized rolling mean via a prefix sum (used when Numba is missing).
+
+    Args:
+        x (np.ndarray): Input values as a float64 array.
+        w (int): Window size.
+
+    Returns:
+        np.ndarray: Rolling mean, NaN for the first w-1 indices.
+    """
+    n = x.shape[0]
+    out = np.empty(n)
+    out[:w - 1] = np.nan
+
+    # Accumulate in float64 even for float32 inputs
+    cs = np.cumsum(x, dtype=np.float64)
+    out[w - 1:] = (cs[w - 1:] - np.concatenate(([0.0], cs[:-w]))) / w
+
+    return out
+
+def _max_drawdown_py(arr):
+    """
+    Maximum drawdown of a portfolio series, in percent (a negative number).
+
+    Fuses the running maximum, the drawdown ratio and the minimum into one
+    pass with no intermediate arrays.
+
+    Args:
+        arr (np.ndarray): Portfolio values as a float array.
+
+    Returns:
+        float: The most negative drawdown, e.g. -12.5 for a 12.5% drop.
+    """
+    run_max = arr[0]
+    min_dd = 0.0
+
+    for i in range(1, arr.shape[0]):
+        v = arr[i]
+        if v > run_max:
+            run_max = v
+        dd = (v - run_max) / run_max
+        if dd < min_dd:
+            min_dd = dd
+
+    return min_dd * 100.0
+
+# Compile the kernels when Numba is available, otherwise use the plain
+# versions. Explicit signatures compile at import time with known types and
+# cache=True persists the result in __pycache__ across runs. Inputs are
+# declared readonly because pandas' to_numpy can return a read-only view;
+# rolling_mean also accepts float32 prices (the running sum stays float64).
+if numba is not None:
+    _RO_F8 = numba.types.Array(numba.types.float64, 1, 'C', readonly=True)
+    _RO_F4 = numba.types.Array(numba.types.float32, 1, 'C', readonly=True)
+    rolling_mean = numba.njit(
+        [numba.types.float64[:](_RO_F8, numba.types.int64),
+         numba.types.float64[:](_RO_F4, numba.types.int64)], cache=True)(_rolling_mean_numba)
+    max_drawdown = numba.njit(
+        [numba.types.float64(_RO_F8)], cache=True)(_max_drawdown_py)
+else:
+    rolling_mean = _rolling_mean_numpy
+    max_drawdown = _max_drawdown_py
+
+if __name__ == "__main__":
+    # Warm the on-disk compile cache (e.g. during a CI build):
+    #   PREWARM=1 python -m src.rolling
+    if os.environ.get("PREWARM"):
+        rolling_mean(np.zeros(8), 5)
+        max_drawdown(np.ones(8))
+        # Importing the simulators compiles (or cache-loads) their cores
+        # too, so one command warms every kernel cache
+        from . import greedy_simulator  # noqa: F401
+        print("Numba kernel cache warmed.")